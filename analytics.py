@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_supertrend
+
+# ======================
+# Config
+# ======================
+DIMENSIONS = ['strategy', 'direction', 'hour_of_day', 'weekday', 'vol_regime',
+              'trend', 'ema_trend', 'strike_offset']
+MEASURES = ['trades', 'wins', 'pnl', 'pnl_sq']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+VOL_REGIMES = ['low', 'mid', 'high']
+# rolling std of 5-minute log returns splitting low / mid / high (roughly the
+# terciles of Data/BTC5min.csv); fixed so a bar's regime never depends on later
+# bars and cubes built from different histories stay comparable
+VOL_CUTOFFS = (0.00055, 0.00084)
+ORDERED_DIMS = {'weekday': WEEKDAYS, 'vol_regime': VOL_REGIMES}
+
+# ======================
+# Market context per bar
+# ======================
+# Regime columns every trade is tagged with. Volatility regime buckets the
+# rolling log-return std by `vol_cutoffs`; the cutoffs travel with the frame
+# (and the cubes built from it) in `attrs`.
+def market_context(bars, st_period=10, st_multiplier=3.0, vol_window=12,
+                   ema_short=50, ema_long=200, vol_cutoffs=VOL_CUTOFFS):
+    df = compute_supertrend(bars, period=st_period, multiplier=st_multiplier)
+    vol = np.log(df['close']).diff().rolling(vol_window).std()
+    ema_s = df['close'].ewm(span=ema_short, adjust=False).mean()
+    ema_l = df['close'].ewm(span=ema_long, adjust=False).mean()
+
+    context = pd.DataFrame({'time': df['time']})
+    context['vol_regime'] = pd.cut(vol, [-np.inf, *vol_cutoffs, np.inf], labels=VOL_REGIMES)
+    context['trend'] = df['Trend'].map({1: 'up', -1: 'down'})
+    context['ema_trend'] = np.where(ema_s > ema_l, 'bull', 'bear')
+    context.attrs['vol_cutoffs'] = tuple(float(c) for c in vol_cutoffs)
+    return context
+
+# ======================
+# Trade log -> tagged facts
+# ======================
+# Accepts the summary frames the strategy scripts write. P&L comes from a
+# `pnl` column when present, otherwise +1 / -1 per win / loss.
+def tag_trades(trades, context, strategy='default'):
+    trades = trades.copy()
+    trades['signal_time'] = pd.to_datetime(trades['signal_time'])
+    trades = trades.sort_values('signal_time').reset_index(drop=True)
+    trades = pd.merge_asof(trades, context, left_on='signal_time', right_on='time',
+                           direction='backward', suffixes=('', '_bar'))
+
+    if 'strategy' not in trades:
+        trades['strategy'] = strategy
+    trades['hour_of_day'] = trades['signal_time'].dt.hour
+    trades['weekday'] = pd.Categorical(trades['signal_time'].dt.day_name(), categories=WEEKDAYS)
+    trades['strike_offset'] = (trades['signal_close'] - trades['strike']).abs().round(2)
+    trades['win'] = (trades['outcome'] == 'win').astype(int)
+    if 'pnl' not in trades:
+        trades['pnl'] = np.where(trades['win'] == 1, 1.0, -1.0)
+    trades.attrs['vol_cutoffs'] = context.attrs.get('vol_cutoffs')
+    return trades
+
+# ======================
+# Cube
+# ======================
+# One row per observed combination of DIMENSIONS holding additive measures,
+# so any roll-up is a groupby-sum over a few thousand rows instead of a
+# rescan of the trade log.
+def build_cube(tagged, dims=DIMENSIONS):
+    facts = tagged.assign(pnl_sq=tagged['pnl'] ** 2)
+    cube = facts.groupby(list(dims), observed=True, dropna=False).agg(
+        trades=('win', 'size'),
+        wins=('win', 'sum'),
+        pnl=('pnl', 'sum'),
+        pnl_sq=('pnl_sq', 'sum'),
+    )
+    cube = _as_categories(cube.reset_index(), dims)
+    cube.attrs['vol_cutoffs'] = tagged.attrs.get('vol_cutoffs')
+    return cube
+
+# Cubes only add up when their vol_regime labels mean the same thing.
+def merge_cubes(*cubes):
+    cutoffs = {c.attrs.get('vol_cutoffs') for c in cubes}
+    if len(cutoffs) > 1:
+        raise ValueError(f"Cannot merge cubes with different vol_cutoffs: {sorted(cutoffs, key=str)}")
+    dims = [c for c in cubes[0].columns if c not in MEASURES]
+    merged = pd.concat(cubes, ignore_index=True)
+    for col in dims:
+        merged[col] = merged[col].astype(object)
+    cube = merged.groupby(dims, dropna=False)[MEASURES].sum().reset_index()
+    cube = _as_categories(cube, dims)
+    cube.attrs['vol_cutoffs'] = cutoffs.pop()
+    return cube
+
+def _as_categories(cube, dims):
+    for col in dims:
+        if col in ORDERED_DIMS:
+            cube[col] = pd.Categorical(cube[col], categories=ORDERED_DIMS[col])
+        elif not isinstance(cube[col].dtype, pd.CategoricalDtype):
+            cube[col] = cube[col].astype('category')
+    return cube
+
+# Slice with filters (value or list of values per dimension), then roll up
+# onto `by`. Returns counts, P&L and derived rates per group.
+def query(cube, by=(), **filters):
+    view = cube
+    for dim, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        view = view[view[dim].isin(values)]
+
+    by = [by] if isinstance(by, str) else list(by)
+    if by:
+        out = view.groupby(by, observed=True)[MEASURES].sum()
+    else:
+        out = view[MEASURES].sum().to_frame('all').T
+
+    out['losses'] = out['trades'] - out['wins']
+    out['win_rate'] = out['wins'] / out['trades'] * 100
+    out['avg_pnl'] = out['pnl'] / out['trades']
+    out['pnl_std'] = np.sqrt(out['pnl_sq'] / out['trades'] - out['avg_pnl'] ** 2)
+    return out[['trades', 'wins', 'losses', 'win_rate', 'pnl', 'avg_pnl', 'pnl_std']]
+
+# The vol cutoffs are kept in a leading `# vol_cutoffs=lo,hi` line.
+def save_cube(cube, path):
+    with open(path, 'w', newline='') as f:
+        cutoffs = cube.attrs.get('vol_cutoffs')
+        if cutoffs is not None:
+            f.write("# vol_cutoffs=" + ",".join(repr(c) for c in cutoffs) + "\n")
+        cube.to_csv(f, index=False)
+
+def load_cube(path):
+    with open(path) as f:
+        first = f.readline()
+    cutoffs = None
+    if first.startswith("# vol_cutoffs="):
+        cutoffs = tuple(float(c) for c in first.split("=", 1)[1].split(","))
+    cube = pd.read_csv(path, skiprows=1 if cutoffs is not None else 0)
+    dims = [c for c in cube.columns if c not in MEASURES]
+    cube = _as_categories(cube, dims)
+    cube.attrs['vol_cutoffs'] = cutoffs
+    return cube
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a trade-analytics cube from strategy result CSVs.")
+    parser.add_argument('trades', nargs='+', help="result CSVs; the file name becomes the strategy label")
+    parser.add_argument('--bars', default=os.path.join("Data", "BTC5min.csv"))
+    parser.add_argument('--out', help="where to save the cube (CSV)")
+    args = parser.parse_args()
+
+    bars = pd.read_csv(args.bars)
+    bars['time'] = pd.to_datetime(bars['time'])
+    bars = bars.sort_values('time').reset_index(drop=True)
+    context = market_context(bars)
+
+    cubes = []
+    for path in args.trades:
+        label = os.path.splitext(os.path.basename(path))[0]
+        cubes.append(build_cube(tag_trades(pd.read_csv(path), context, strategy=label)))
+    cube = merge_cubes(*cubes)
+
+    if args.out:
+        save_cube(cube, args.out)
+        print(f"\n✅ Cube ({len(cube)} cells) saved to {args.out}")
+
+    for dim in ['strategy', 'hour_of_day', 'weekday', 'vol_regime', 'trend', 'ema_trend']:
+        print(f"\n--- Performance by {dim} ---")
+        print(query(cube, by=dim).round(2).to_string())
@@ -0,0 +1,245 @@
+import asyncio
+import csv
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+import pandas as pd
+
+# ======================
+# Config
+# ======================
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "BTC5min.csv")
+BASE_URL = "https://api.binance.com"
+KLINES_ENDPOINT = "/api/v3/klines"
+SYMBOL = "BTCUSDT"
+INTERVAL = "5m"
+PAGE_LIMIT = 1000          # max bars per request the API allows
+MAX_CONCURRENCY = 4        # requests in flight (also the pool size)
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5         # seconds, doubled per retry
+REQUEST_TIMEOUT = 30
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '1d': 86_400_000,
+}
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+
+
+class DownloadError(RuntimeError):
+    pass
+
+# ======================
+# Time helpers
+# ======================
+def to_ms(ts):
+    return int(pd.Timestamp(ts).timestamp() * 1000)
+
+def page_ranges(start_ms, end_ms, bar_ms, limit=PAGE_LIMIT):
+    # split [start_ms, end_ms) into pages of at most `limit` bars
+    span = bar_ms * limit
+    return [(s, min(s + span, end_ms) - 1) for s in range(start_ms, end_ms, span)]
+
+def last_closed_bar_ms(bar_ms, now=None):
+    now = now or datetime.now(timezone.utc)
+    now_ms = int(now.timestamp() * 1000)
+    # open time of the bar still forming; everything before it is final
+    return now_ms - now_ms % bar_ms
+
+# ======================
+# HTTP
+# ======================
+# Retry-After is either delay-seconds or an HTTP-date (RFC 9110); None when
+# it is missing or unparseable, so the caller falls back to its own backoff.
+def parse_retry_after(header, now=None):
+    if not header:
+        return None
+    try:
+        return max(float(header), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((when - now).total_seconds(), 0.0)
+
+async def fetch_page(session, sem, start_ms, end_ms, base_url=BASE_URL, symbol=SYMBOL,
+                     interval=INTERVAL, limit=PAGE_LIMIT, max_retries=MAX_RETRIES):
+    params = {'symbol': symbol, 'interval': interval, 'startTime': start_ms,
+              'endTime': end_ms, 'limit': limit}
+    url = base_url.rstrip('/') + KLINES_ENDPOINT
+
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        async with sem:
+            try:
+                async with session.get(url, params=params) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    if resp.status not in RETRY_STATUS:
+                        raise DownloadError(f"HTTP {resp.status} for {params}: {await resp.text()}")
+                    retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                pass
+
+        if attempt == max_retries:
+            break
+        # back off outside the semaphore so other pages keep flowing
+        delay = retry_after if retry_after is not None else BACKOFF_BASE * 2 ** attempt
+        await asyncio.sleep(delay + random.uniform(0, BACKOFF_BASE))
+
+    raise DownloadError(f"Giving up after {max_retries} retries: {params}")
+
+def klines_to_frame(rows):
+    df = pd.DataFrame([r[:6] for r in rows], columns=['open_ms', 'open', 'high', 'low', 'close', 'Volume'])
+    for col in ['open', 'high', 'low', 'close', 'Volume']:
+        df[col] = df[col].astype(float)
+    df['time'] = pd.to_datetime(df['open_ms'], unit='ms', utc=True)
+    return df[['time', 'open', 'high', 'low', 'close', 'Volume']]
+
+# Yields one frame per page, in time order, while later pages are still in
+# flight; a page that fails for good raises only after every earlier page has
+# been yielded, so callers can keep the contiguous prefix.
+async def stream_bars(start, end, base_url=BASE_URL, symbol=SYMBOL, interval=INTERVAL,
+                      limit=PAGE_LIMIT, max_concurrency=MAX_CONCURRENCY, session=None,
+                      max_retries=MAX_RETRIES):
+    bar_ms = INTERVAL_MS[interval]
+    start_ms, end_ms = to_ms(start), to_ms(end)
+    start_ms += -start_ms % bar_ms
+    pages = page_ranges(start_ms, end_ms, bar_ms, limit)
+    if not pages:
+        return
+    end_time = pd.Timestamp(end_ms, unit='ms', tz='UTC')
+
+    own_session = session is None
+    if own_session:
+        connector = aiohttp.TCPConnector(limit=max_concurrency, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector,
+                                        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+    sem = asyncio.Semaphore(max_concurrency)
+    tasks = [asyncio.ensure_future(fetch_page(session, sem, s, e, base_url, symbol, interval,
+                                              limit, max_retries)) for s, e in pages]
+    try:
+        for task in tasks:
+            bars = klines_to_frame(await task)
+            bars = bars[bars['time'] < end_time]
+            yield bars.drop_duplicates('time').sort_values('time').reset_index(drop=True)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_session:
+            await session.close()
+
+async def download_bars(start, end, base_url=BASE_URL, symbol=SYMBOL, interval=INTERVAL,
+                        limit=PAGE_LIMIT, max_concurrency=MAX_CONCURRENCY, session=None,
+                        max_retries=MAX_RETRIES):
+    frames = [bars async for bars in stream_bars(start, end, base_url, symbol, interval, limit,
+                                                 max_concurrency, session, max_retries)]
+    if not frames:
+        return klines_to_frame([])
+    bars = pd.concat(frames, ignore_index=True)
+    return bars.drop_duplicates('time').sort_values('time').reset_index(drop=True)
+
+# ======================
+# Bar store (append-only CSV)
+# ======================
+def read_store_tail(csv_path):
+    # last row of the store without loading the whole file
+    with open(csv_path, 'rb') as f:
+        header = f.readline().decode().strip().split(',')
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        block = b''
+        while pos > 0 and block.count(b'\n') < 2:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step) + block
+    lines = [ln for ln in block.decode().splitlines() if ln.strip()]
+    last = lines[-1].split(',') if lines else []
+    if not last or last == header:
+        return header, None
+    return header, pd.Timestamp(last[header.index('time')])
+
+def append_bars(csv_path, bars, tz=None):
+    # appends OHLCV rows after the last stored bar; history is never rewritten
+    exists = os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+    header, last_time = read_store_tail(csv_path) if exists else (list(bars.columns), None)
+    if last_time is not None:
+        bars = bars[bars['time'] > last_time]
+        tz = tz or last_time.tzinfo
+    if bars.empty:
+        return 0
+
+    times = bars['time'].dt.tz_convert(tz) if tz is not None else bars['time']
+    volume_col = next((c for c in header if c.lower() == 'volume'), 'Volume')
+    values = {'time': times.map(lambda t: t.isoformat()), volume_col: bars['Volume']}
+    for col in ['open', 'high', 'low', 'close']:
+        values[col] = bars[col]
+
+    needs_newline = False
+    if exists:
+        with open(csv_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+    with open(csv_path, 'a', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        if not exists:
+            writer.writerow(header)
+        elif needs_newline:
+            f.write('\n')
+        columns = [values.get(col) for col in header]
+        for i in range(len(bars)):
+            writer.writerow(['NaN' if c is None else c.iloc[i] for c in columns])
+    return len(bars)
+
+# Pages are appended as they arrive in order, so a failed backfill keeps its
+# progress and the next run resumes after the last stored bar.
+async def update_store(csv_path=CSV_PATH, start=None, base_url=BASE_URL, symbol=SYMBOL,
+                       interval=INTERVAL, max_concurrency=MAX_CONCURRENCY, now=None,
+                       max_retries=MAX_RETRIES):
+    bar_ms = INTERVAL_MS[interval]
+    last_time = None
+    if os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+        _, last_time = read_store_tail(csv_path)
+
+    if last_time is not None:
+        start = last_time + timedelta(milliseconds=bar_ms)
+    elif start is None:
+        raise ValueError("Empty store: pass a start time for the first download")
+
+    end_ms = last_closed_bar_ms(bar_ms, now)
+    tz = None if last_time is not None else timezone.utc
+    added = 0
+    async for bars in stream_bars(start, pd.Timestamp(end_ms, unit='ms', tz='UTC'), base_url,
+                                  symbol, interval, max_concurrency=max_concurrency,
+                                  max_retries=max_retries):
+        added += append_bars(csv_path, bars, tz=tz)
+    return added
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Append new OHLCV bars to the local bar store.")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--start', help="first bar time when the store is empty (ISO 8601)")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--symbol', default=SYMBOL)
+    parser.add_argument('--interval', default=INTERVAL, choices=sorted(INTERVAL_MS))
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    added = asyncio.run(update_store(args.csv, args.start, args.base_url, args.symbol,
+                                     args.interval, args.concurrency))
+    print(f"✅ Appended {added} bars to {args.csv}")
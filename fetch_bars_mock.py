@@ -0,0 +1,119 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pandas as pd
+from aiohttp import web
+
+from fetch_bars import INTERVAL_MS, KLINES_ENDPOINT, DownloadError, read_store_tail, update_store
+
+# ======================
+# Canned klines server
+# ======================
+# Serves deterministic bars for any range, like /api/v3/klines. Pages whose
+# startTime is in `throttle` get one 429 (Retry-After as an HTTP-date) before
+# succeeding; pages in `fail` always answer 500.
+def canned_price(open_ms, bar_ms):
+    return 100_000.0 + (open_ms // bar_ms) % 1000
+
+def canned_klines(start_ms, end_ms, bar_ms, limit):
+    first = start_ms + (-start_ms % bar_ms)
+    rows = []
+    for t in range(first, end_ms + 1, bar_ms):
+        if len(rows) == limit:
+            break
+        p = canned_price(t, bar_ms)
+        rows.append([t, str(p), str(p + 5), str(p - 5), str(p + 1), "1.5", t + bar_ms - 1])
+    return rows
+
+def make_app(throttle=(), fail=()):
+    app = web.Application()
+    app['throttle'] = set(throttle)
+    app['fail'] = set(fail)
+    app['requests'] = []
+
+    async def klines(request):
+        q = request.query
+        start_ms, end_ms = int(q['startTime']), int(q['endTime'])
+        request.app['requests'].append(start_ms)
+        if start_ms in request.app['fail']:
+            return web.Response(status=500, text="canned failure")
+        if start_ms in request.app['throttle']:
+            request.app['throttle'].discard(start_ms)
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+            return web.Response(status=429, headers={'Retry-After': format_datetime(retry_at, usegmt=True)})
+        return web.json_response(canned_klines(start_ms, end_ms, INTERVAL_MS[q['interval']], int(q['limit'])))
+
+    app.router.add_get(KLINES_ENDPOINT, klines)
+    return app
+
+async def start_server(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+# ======================
+# Check
+# ======================
+def check_store(csv_path, n_bars, start, bar_ms):
+    df = pd.read_csv(csv_path)
+    times = pd.to_datetime(df['time'])
+    expected = pd.date_range(start, periods=n_bars, freq=pd.Timedelta(milliseconds=bar_ms))
+    assert len(df) == n_bars, f"{len(df)} bars stored, expected {n_bars}"
+    assert (times.values == expected.values).all(), "bars are not contiguous"
+    opens = [canned_price(int(t.timestamp() * 1000), bar_ms) for t in expected]
+    assert (df['open'].to_numpy() == opens).all(), "bar values differ from the canned pages"
+
+async def run_check():
+    interval = '5m'
+    bar_ms = INTERVAL_MS[interval]
+    start = pd.Timestamp("2024-01-01", tz='UTC')
+    start_ms = int(start.timestamp() * 1000)
+    page_ms = 1000 * bar_ms
+    n_bars = 3500
+    now = (start + pd.Timedelta(milliseconds=n_bars * bar_ms + 60_000)).to_pydatetime()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # --- paging + one throttled page, then a no-op rerun ---
+        app = make_app(throttle={start_ms + page_ms})
+        runner, url = await start_server(app)
+        try:
+            csv_path = os.path.join(tmp, "bars.csv")
+            added = await update_store(csv_path, start, url, interval=interval, now=now)
+            assert added == n_bars, f"appended {added}, expected {n_bars}"
+            check_store(csv_path, n_bars, start, bar_ms)
+            assert app['requests'].count(start_ms + page_ms) == 2, "429 page was not retried once"
+            assert await update_store(csv_path, None, url, interval=interval, now=now) == 0
+            print(f"✅ {n_bars} bars in {len(app['requests'])} requests, 429 retried, rerun is a no-op")
+        finally:
+            await runner.cleanup()
+
+        # --- a page failing for good keeps the pages before it; the next run resumes ---
+        app = make_app(fail={start_ms + 2 * page_ms})
+        runner, url = await start_server(app)
+        try:
+            csv_path = os.path.join(tmp, "resume.csv")
+            try:
+                await update_store(csv_path, start, url, interval=interval, now=now, max_retries=1)
+                raise AssertionError("failing page did not raise")
+            except DownloadError:
+                pass
+            check_store(csv_path, 2 * 1000, start, bar_ms)
+            _, last_time = read_store_tail(csv_path)
+
+            app['fail'].clear()
+            added = await update_store(csv_path, None, url, interval=interval, now=now)
+            assert added == n_bars - 2000, f"resumed with {added} bars"
+            check_store(csv_path, n_bars, start, bar_ms)
+            print(f"✅ failed backfill kept bars up to {last_time}, rerun appended the remaining {added}")
+        finally:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(run_check())
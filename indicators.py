@@ -0,0 +1,204 @@
+import pandas as pd
+import numpy as np
+
+# ======================
+# Sliding-window max / min (O(N), van Herk / Gil-Werman)
+# ======================
+# The series is cut into blocks of `window`; any window spans at most two
+# blocks, so its extreme is the suffix-extreme of the first block combined
+# with the prefix-extreme of the second. NaN propagates like pandas rolling
+# (a window containing NaN yields NaN).
+def _sliding_extreme(values, window, ufunc, identity):
+    a = np.asarray(values, dtype=float)
+    n = len(a)
+    out = np.full(n, np.nan)
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    if n < window:
+        return out
+
+    pad = (-n) % window
+    blocks = np.concatenate([a, np.full(pad, identity)]).reshape(-1, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+def rolling_max(series, window):
+    return pd.Series(_sliding_extreme(series, window, np.maximum, -np.inf), index=series.index)
+
+def rolling_min(series, window):
+    return pd.Series(_sliding_extreme(series, window, np.minimum, np.inf), index=series.index)
+
+# ======================
+# RSI (Wilder, TradingView ta.rsi)
+# ======================
+# ta.rma seeds with the SMA of the first `period` values, then recurses with
+# alpha = 1/period. Seeding the ewm with that SMA reproduces it exactly.
+def _rma(series, period):
+    values = series.to_numpy(dtype=float, copy=True)
+    valid = np.flatnonzero(~np.isnan(values))
+    seeded = np.full(len(values), np.nan)
+    if len(valid) < period:
+        return pd.Series(seeded, index=series.index)
+
+    start = valid[0]
+    seed_at = start + period - 1
+    seeded[seed_at] = values[start:seed_at + 1].mean()
+    seeded[seed_at + 1:] = values[seed_at + 1:]
+    return pd.Series(seeded, index=series.index).ewm(alpha=1 / period, adjust=False).mean()
+
+def compute_rsi(close, period=14):
+    delta = close.diff()
+    gain = _rma(delta.clip(lower=0), period)
+    loss = _rma(-delta.clip(upper=0), period)
+    rsi = 100 - 100 / (1 + gain / loss)
+    # all-gain windows divide by zero loss
+    return rsi.where(loss != 0, 100.0).where(gain.notna() & loss.notna())
+
+# ======================
+# Stochastic oscillator
+# ======================
+def _stoch_k(source_high, source_low, source_close, k_period):
+    highest = rolling_max(source_high, k_period)
+    lowest = rolling_min(source_low, k_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (source_close - lowest) / (highest - lowest)
+    return k.replace([np.inf, -np.inf], np.nan)
+
+def compute_stoch(df, k_period=14, smooth_k=1, d_period=3):
+    k = _stoch_k(df['high'], df['low'], df['close'], k_period).rolling(smooth_k).mean()
+    d = k.rolling(d_period).mean()
+    return k, d
+
+def compute_stoch_rsi(close, rsi_period=14, stoch_period=14, smooth_k=3, d_period=3):
+    rsi = compute_rsi(close, rsi_period)
+    k = _stoch_k(rsi, rsi, rsi, stoch_period).rolling(smooth_k).mean()
+    d = k.rolling(d_period).mean()
+    return k, d
+
+# ======================
+# SuperTrend Calculation
+# ======================
+def compute_atr(df, period=14):
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    return tr.rolling(period).mean()
+
+def compute_supertrend(df, period=10, multiplier=3):
+    df = df.copy()
+    hl2 = (df['high'] + df['low']) / 2
+    atr = compute_atr(df, period)
+    upperband = hl2 + multiplier * atr
+    lowerband = hl2 - multiplier * atr
+
+    supertrend = [np.nan] * len(df)
+    trend = [1] * len(df)
+
+    for i in range(period, len(df)):
+        if df['close'].iloc[i] > upperband.iloc[i - 1]:
+            trend[i] = 1
+        elif df['close'].iloc[i] < lowerband.iloc[i - 1]:
+            trend[i] = -1
+        else:
+            trend[i] = trend[i - 1]
+
+        if trend[i] == 1:
+            supertrend[i] = lowerband.iloc[i]
+        else:
+            supertrend[i] = upperband.iloc[i]
+
+    df['SuperTrend'] = supertrend
+    df['Trend'] = trend
+    return df
+
+# ======================
+# Higher-timeframe bars
+# ======================
+# Buckets base bars by `rule` (e.g. '10min'). Each bucket's value becomes known
+# on the last base bar inside it, which is where TradingView stamps it.
+def resample_bars(df, rule):
+    bucket = df['time'].dt.floor(rule)
+    grouped = df.groupby(bucket, sort=True)
+    bars = pd.DataFrame({
+        'open': grouped['open'].first(),
+        'high': grouped['high'].max(),
+        'low': grouped['low'].min(),
+        'close': grouped['close'].last(),
+        'last_row': pd.Series(df.index, index=df.index).groupby(bucket, sort=True).last(),
+    })
+    return bars.reset_index(drop=True)
+
+def _to_base(values, bars, base_index, ffill):
+    out = pd.Series(np.nan, index=base_index)
+    out.loc[bars['last_row'].to_numpy()] = values.to_numpy()
+    return out.ffill() if ffill else out
+
+# ======================
+# Strategy columns
+# ======================
+# Recomputes RSI / K / D from OHLC, replacing the TradingView export columns.
+# Defaults match the export in Data/BTC5min.csv: RSI(14) on the base bars and
+# Stoch RSI (3, 3, 14, 14) on 10-minute bars. K / D are stamped only on the bar
+# that closes each higher-timeframe bucket (NaN in between), like the export;
+# ffill=True carries the latest value onto every base bar instead, which lets
+# K/D crosses be re-evaluated on bars the export never scored.
+def compute_oscillators(df, rsi_period=14, stoch_timeframe='10min', stoch_rsi=True,
+                        stoch_period=14, smooth_k=3, d_period=3, ffill=False):
+    df = df.copy()
+    df['RSI'] = compute_rsi(df['close'], rsi_period)
+
+    if stoch_timeframe is None:
+        bars = df[['open', 'high', 'low', 'close']].copy()
+        bars['last_row'] = df.index
+    else:
+        bars = resample_bars(df, stoch_timeframe)
+
+    if stoch_rsi:
+        k, d = compute_stoch_rsi(bars['close'], rsi_period, stoch_period, smooth_k, d_period)
+    else:
+        k, d = compute_stoch(bars, stoch_period, smooth_k, d_period)
+
+    df['K'] = _to_base(k, bars, df.index, ffill)
+    df['D'] = _to_base(d, bars, df.index, ffill)
+    return df
+
+# ======================
+# Parity vs exported columns
+# ======================
+def parity_report(exported, native, columns=('RSI', 'K', 'D'), tolerance=1e-6):
+    rows = []
+    for col in columns:
+        if col not in exported:
+            continue
+        exp = exported[col].astype(float)
+        nat = native[col].astype(float)
+        both = exp.notna() & nat.notna()
+        diff = (exp[both] - nat[both]).abs()
+        rows.append({
+            'column': col,
+            'exported_rows': int(exp.notna().sum()),
+            'native_rows': int(nat.notna().sum()),
+            'compared': int(both.sum()),
+            'only_exported': int((exp.notna() & nat.isna()).sum()),
+            'only_native': int((nat.notna() & exp.isna()).sum()),
+            'max_abs_diff': diff.max() if len(diff) else np.nan,
+            'median_abs_diff': diff.median() if len(diff) else np.nan,
+            'within_tol_pct': (diff <= tolerance).mean() * 100 if len(diff) else np.nan,
+        })
+    return pd.DataFrame(rows).set_index('column')
+
+
+if __name__ == '__main__':
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "Data/BTC5min.csv"
+    df = pd.read_csv(csv_path)
+    df['time'] = pd.to_datetime(df['time'])
+    df = df.sort_values('time').reset_index(drop=True)
+
+    native = compute_oscillators(df)
+    print("\n--- Native vs exported indicator parity ---")
+    print(parity_report(df, native).to_string())
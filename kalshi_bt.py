@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# Single entry point for the strategy backtests:
+#
+#   python kalshi_bt.py run rsi --data Data/BTC5min.csv --strike-offset 150
+#   python kalshi_bt.py run supertrend --period 12 --multiplier 2.5 --out trades.csv
+#   python kalshi_bt.py optimize supertrend --compare-grid
+#
+# Only stdlib is imported at startup; a subcommand imports its strategy
+# module (and through it pandas) when it runs, and matplotlib is only loaded
+# (Agg, no display) when --plot / --plot-dir ask for a chart, so runs are
+# headless and cheap to launch from cron or sweeps.
+import argparse
+import os
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+from strategies import DEFAULT_CSV, HOUR_LOCK_STRATEGIES, STRATEGIES, load_strategy, split_params
+
+PLOT_OVERLAYS = {
+    'supertrend': [('SuperTrend', 'orange')],
+    'squeeze': [('EMA50', 'orange'), ('EMA200', 'blue')],
+}
+PLOT_BANDS = {
+    'squeeze': [('lower_bb', 'upper_bb', 'gray', 'Bollinger Bands')],
+}
+
+# ======================
+# Commands
+# ======================
+def cmd_run(args):
+    timings = {'startup': time.perf_counter() - _T0}
+
+    t = time.perf_counter()
+    module = load_strategy(args.strategy)
+    timings['import'] = time.perf_counter() - t
+
+    load_kwargs, run_kwargs = split_params(args.strategy, args)
+    t = time.perf_counter()
+    df = module.load_data(args.data, **load_kwargs)
+    timings['load'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    summary = module.run_strategy(df, **run_kwargs)
+    timings['strategy'] = time.perf_counter() - t
+
+    if summary.empty:
+        print(f"⚠️ {args.strategy}: no signals")
+    else:
+        total = len(summary)
+        wins = int((summary['outcome'] == 'win').sum())
+        print(f"{args.strategy}: {total} trades | Wins: {wins} | Losses: {total - wins} "
+              f"| Win rate: {wins / total * 100:.2f}%")
+        if not args.quiet:
+            print("\n--- Performance by Direction ---")
+            print(summary.groupby(['direction', 'outcome']).size().unstack(fill_value=0))
+
+    if args.quotes and not summary.empty:
+        t = time.perf_counter()
+        import quotes
+
+        summary = quotes.attach_quotes(summary, quotes.load_quotes(args.quotes))
+        fills = quotes.pnl_summary(summary)
+        timings['quotes'] = time.perf_counter() - t
+        print(f"Quoted fills: {fills['quoted']}/{fills['signals']} | Contract wins: {fills['contract_wins']} "
+              f"| Avg entry: {fills['avg_entry']:.1f}¢ | Avg spread: {fills['avg_spread']:.1f}¢ "
+              f"| P&L: {fills['total_pnl']:.0f}¢ ({fills['avg_pnl']:.2f}¢/contract)")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        summary.to_csv(args.out, index=False)
+        print(f"✅ Results saved to {args.out}")
+
+    if args.plot or args.plot_dir:
+        t = time.perf_counter()
+        import plotting
+
+        overlays = PLOT_OVERLAYS.get(args.strategy, [])
+        bands = PLOT_BANDS.get(args.strategy, [])
+        title = f"{args.strategy} backtest"
+        if args.plot:
+            plotting.render_chart(df, args.plot, trades=summary, overlays=overlays, title=title,
+                                  method=args.decimate, bands=bands)
+            print(f"✅ Chart saved to {args.plot}")
+        if args.plot_dir:
+            jobs = plotting.monthly_jobs(df, args.plot_dir, trades=summary, overlays=overlays,
+                                         title=title, method=args.decimate, bands=bands)
+            plotting.render_batch(jobs, workers=args.workers)
+            print(f"✅ {len(jobs)} monthly charts saved to {args.plot_dir}")
+        timings['plot'] = time.perf_counter() - t
+
+    if args.timing:
+        parts = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in timings.items())
+        print(f"⏱ {parts}", file=sys.stderr)
+    return 0
+
+def cmd_optimize(args):
+    from optimize import run_optimizer
+
+    t = time.perf_counter()
+    ranking, compute = run_optimizer(
+        args.strategy, args.method, args.data, candidates=args.candidates,
+        min_fraction=args.min_fraction, eta=args.eta, workers=args.workers, seed=args.seed,
+        quotes_dir=args.quotes, min_trades=args.min_trades)
+    elapsed = time.perf_counter() - t
+
+    print(f"\n--- {args.strategy} {args.method}: top {args.top} of {len(ranking)} finalists ---")
+    print(ranking.head(args.top).to_string(index=False))
+    print(f"\nCompute: {compute * 100:.1f}% of a full grid | {elapsed:.1f}s")
+
+    if args.compare_grid and args.method != 'grid':
+        grid, _ = run_optimizer(
+            args.strategy, 'grid', args.data, workers=args.workers,
+            quotes_dir=args.quotes, min_trades=args.min_trades)
+        params = [c for c in grid.columns if c != 'score']
+        best, grid_best = ranking.iloc[0], grid.iloc[0]
+        same_params = all(best[p] == grid_best[p] for p in params)
+        print("\n--- Full grid best ---")
+        print(grid.head(1).to_string(index=False))
+        if same_params:
+            print("✅ Same optimum")
+        elif best['score'] == grid_best['score']:
+            print("⚠️ Different parameters with the same score (tie)")
+        else:
+            print("⚠️ Different optimum")
+    return 0
+
+# ======================
+# Argument parsing
+# ======================
+def build_parser():
+    parser = argparse.ArgumentParser(prog='kalshi-bt', description="Kalshi hourly BTC strategy backtests.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run one strategy backtest")
+    strategies = run.add_subparsers(dest='strategy', required=True)
+    for name, (script, options) in STRATEGIES.items():
+        sub = strategies.add_parser(name, help=f"strategy from {script}")
+        sub.add_argument('--data', default=DEFAULT_CSV, help="OHLCV CSV (default: %(default)s)")
+        sub.add_argument('--out', help="write the trade log to this CSV")
+        sub.add_argument('--quotes', help="directory of Kalshi quote CSVs for spread-aware P&L")
+        sub.add_argument('--quiet', action='store_true', help="only print the one-line summary")
+        sub.add_argument('--plot', help="render a chart to this PNG/SVG path")
+        sub.add_argument('--plot-dir', help="render one chart per month into this directory")
+        sub.add_argument('--decimate', default='minmax', choices=['minmax', 'lttb', 'none'],
+                         help="line downsampling for charts (default: %(default)s)")
+        sub.add_argument('--workers', type=int, help="processes for --plot-dir (default: all cores)")
+        sub.add_argument('--timing', action='store_true', help="print import/load/strategy timings to stderr")
+        for flag, dest, type_, _, help_ in options:
+            sub.add_argument(flag, dest=dest, type=type_, default=argparse.SUPPRESS, help=help_)
+        if name in HOUR_LOCK_STRATEGIES:
+            sub.add_argument('--no-hour-lock', dest='hour_lock', action='store_false',
+                             default=argparse.SUPPRESS, help="allow more than one trade per hour")
+        sub.set_defaults(func=cmd_run)
+
+    opt = commands.add_parser('optimize', help="search strategy parameters with early stopping")
+    opt.add_argument('strategy', choices=list(STRATEGIES))
+    opt.add_argument('--data', default=DEFAULT_CSV, help="OHLCV CSV (default: %(default)s)")
+    opt.add_argument('--method', default='halving', choices=['halving', 'hyperband', 'random', 'grid'],
+                     help="halving runs successive halving over the whole grid; hyperband samples "
+                          "brackets for spaces too large to grid (default: %(default)s)")
+    opt.add_argument('--candidates', type=int,
+                     help="configs in the first hyperband bracket (default 27; smaller spaces run as a "
+                          "full grid); sample size for random (default 27) and halving (default: whole grid)")
+    opt.add_argument('--eta', type=int, default=3, help="keep 1/eta per rung (default: %(default)s)")
+    opt.add_argument('--min-fraction', type=float, default=1 / 3,
+                     help="share of history seen by the first rung (default: 1/3)")
+    opt.add_argument('--workers', type=int, help="processes (default: all cores)")
+    opt.add_argument('--seed', type=int, default=0)
+    opt.add_argument('--quotes', help="score fills at quoted prices from this directory of Kalshi quote CSVs "
+                                      "(default: fair-value model prices)")
+    opt.add_argument('--min-trades', type=int, default=10, help="fewer priced trades on full history scores -inf")
+    opt.add_argument('--top', type=int, default=10)
+    opt.add_argument('--compare-grid', action='store_true', help="also run the full grid and compare optima")
+    opt.set_defaults(func=cmd_optimize)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import itertools
+import math
+import os
+import random
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import quotes
+from strategies import DEFAULT_CSV, load_strategy, split_params
+
+# ======================
+# Config
+# ======================
+ETA = 3                 # keep 1/ETA of candidates per rung, grow history ETA-fold
+# Share of history the first rung sees. On the ~40 days in Data/BTC5min.csv
+# a ninth (4-5 days) ranks configs barely better than chance (Spearman 0.2-0.4
+# against full history), so the first rung takes a third.
+MIN_FRACTION = 1 / 3
+CANDIDATES = 27         # first hyperband bracket / random-search sample
+MIN_TRADES = 10         # priced trades on full history; scaled down on shorter slices
+CACHE_SIZE = 32         # indicator frames kept per worker
+
+STRIKE_OFFSETS = [50.0 * i for i in range(11)]
+
+SEARCH_SPACES = {
+    'rsi': {
+        'long_below': [5 * i for i in range(1, 11)],
+        'short_above': [5 * i for i in range(10, 20)],
+        'strike_offset': STRIKE_OFFSETS,
+    },
+    'stoch': {
+        'long_below': [5 * i for i in range(1, 11)],
+        'short_above': [5 * i for i in range(10, 20)],
+        'strike_offset': STRIKE_OFFSETS,
+    },
+    'supertrend': {
+        'period': [5, 7, 10, 14, 20, 28],
+        'multiplier': [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0],
+        'strike_offset': STRIKE_OFFSETS,
+    },
+    'squeeze': {
+        'boll_window': [10, 15, 20, 25, 30, 40, 50],
+        'squeeze_ratio': [0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2],
+        'strike_offset': STRIKE_OFFSETS,
+    },
+}
+
+# ======================
+# Scoring
+# ======================
+# Total contract P&L in cents, buying one contract per signal at a price that
+# depends on its strike: the quoted ask when a quotes index is given,
+# otherwise quotes.attach_model_prices' fair value. Unfilled signals count
+# for nothing; too few fills scores -inf.
+def price_trades(trades, bars, index=None):
+    if trades.empty:
+        return trades
+    if index is not None:
+        return quotes.attach_quotes(trades, index)
+    return quotes.attach_model_prices(trades, bars)
+
+def score(priced, min_trades=MIN_TRADES):
+    pnl = priced['contract_pnl'].dropna() if 'contract_pnl' in priced else pd.Series(dtype=float)
+    if len(pnl) < max(min_trades, 1):
+        return float('-inf')
+    return float(pnl.sum())
+
+# ======================
+# Worker side
+# ======================
+# Each process loads the strategy once and caches indicator frames per
+# load_data() parameter set, so rungs only re-run the strategy loop on a
+# longer prefix of the already-computed frame.
+_WORKER = {}
+
+def _init_worker(strategy, csv_path, quotes_dir=None):
+    _WORKER.clear()
+    _WORKER.update(strategy=strategy, csv_path=csv_path, module=load_strategy(strategy), cache={},
+                   index=quotes.load_quotes(quotes_dir) if quotes_dir else None)
+
+def _indicator_frame(load_kwargs):
+    cache = _WORKER['cache']
+    key = tuple(sorted(load_kwargs.items()))
+    if key not in cache:
+        if len(cache) >= CACHE_SIZE:
+            cache.pop(next(iter(cache)))
+        cache[key] = _WORKER['module'].load_data(_WORKER['csv_path'], **load_kwargs)
+    return cache[key]
+
+# Strike offset only decides how a trade settles, never whether it fires (the
+# hour lock ignores outcomes), so one strategy pass serves every offset.
+def settle(trades, strike_offset):
+    if trades.empty:
+        return trades
+    long = (trades['direction'] == 'long').to_numpy()
+    close = trades['signal_close'].to_numpy()
+    final = trades['final_close'].to_numpy()
+    strike = np.where(long, close - strike_offset, close + strike_offset)
+    loss = np.where(long, final < strike, final > strike)
+    return trades.assign(strike=strike, outcome=np.where(loss, 'loss', 'win'))
+
+def _evaluate(task):
+    load_kwargs, run_kwargs, offsets, fraction, min_trades = task
+    df = _indicator_frame(load_kwargs)
+    n_bars = max(int(len(df) * fraction), 2)
+    prefix = df.iloc[:n_bars]
+    run_strategy = _WORKER['module'].run_strategy
+    min_trades = math.ceil(min_trades * fraction)
+
+    if not offsets:
+        trades = run_strategy(prefix, **run_kwargs)
+        return n_bars, [score(price_trades(trades, prefix, _WORKER['index']), min_trades)]
+    trades = run_strategy(prefix, **dict(run_kwargs, strike_offset=0.0))
+    return n_bars, [score(price_trades(settle(trades, off), prefix, _WORKER['index']), min_trades)
+                    for off in offsets]
+
+# ======================
+# Evaluator
+# ======================
+# `offsets`, when given, are swept inside every evaluation: a candidate's score
+# is its best strike offset, remembered in `best_offset`. They cost one
+# pricing pass each, not a strategy pass, so they stay out of the sampled space.
+class Evaluator:
+    def __init__(self, strategy, csv_path=DEFAULT_CSV, workers=None, offsets=None,
+                 quotes_dir=None, min_trades=MIN_TRADES):
+        self.strategy = strategy
+        self.offsets = list(offsets or [])
+        self.min_trades = min_trades
+        self.workers = workers or os.cpu_count() or 1
+        self.results = {}      # (params, fraction) -> score
+        self.best_offset = {}  # (params, fraction) -> strike offset
+        self.bars_evaluated = 0
+        self.history_bars = 0
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                            initargs=(strategy, csv_path, quotes_dir))
+        else:
+            self.pool = None
+            _init_worker(strategy, csv_path, quotes_dir)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Scores candidates on the first `fraction` of history; results are
+    # memoised so brackets revisiting a candidate cost nothing.
+    def evaluate(self, candidates, fraction):
+        todo = [c for c in dict.fromkeys(candidates) if (c, fraction) not in self.results]
+        tasks = []
+        for cand in todo:
+            load_kwargs, run_kwargs = split_params(self.strategy, Namespace(**dict(cand)))
+            tasks.append((load_kwargs, run_kwargs, self.offsets, fraction, self.min_trades))
+        # candidates sharing indicator parameters run back to back on warm caches
+        order = sorted(range(len(todo)), key=lambda i: sorted(tasks[i][0].items()))
+
+        mapper = self.pool.map if self.pool is not None else map
+        for i, (n_bars, scores) in zip(order, mapper(_evaluate, [tasks[i] for i in order])):
+            self.bars_evaluated += n_bars
+            self.history_bars = max(self.history_bars, n_bars)
+            best = int(np.argmax(scores))
+            self.results[(todo[i], fraction)] = scores[best]
+            if self.offsets:
+                self.best_offset[(todo[i], fraction)] = self.offsets[best]
+        return {c: self.results[(c, fraction)] for c in candidates}
+
+# ======================
+# Search
+# ======================
+# Candidates are hashable tuples of (name, value) pairs.
+def grid_candidates(space):
+    names = list(space)
+    return [tuple(zip(names, values)) for values in itertools.product(*space.values())]
+
+def sample_candidates(space, n, rng):
+    grid = grid_candidates(space)
+    return grid if n >= len(grid) else rng.sample(grid, n)
+
+def successive_halving(evaluator, candidates, min_fraction=MIN_FRACTION, eta=ETA):
+    n_rungs = max(1, round(math.log(1 / min_fraction, eta)) + 1)
+    survivors = list(candidates)
+    for rung in range(n_rungs):
+        fraction = min(1.0, eta ** (rung - n_rungs + 1))
+        scores = evaluator.evaluate(survivors, fraction)
+        ranked = sorted(survivors, key=lambda c: scores[c], reverse=True)
+        if rung < n_rungs - 1:
+            survivors = ranked[:math.ceil(len(ranked) / eta)]
+        else:
+            survivors = ranked
+    return {c: scores[c] for c in survivors}
+
+# Brackets trade candidate count against how short the first slice is
+# (Li et al. 2018). The most aggressive bracket starts `candidates` configs on
+# `min_fraction` of history; every bracket finishes on the full history.
+# Early stopping only saves work when the space is much larger than that first
+# bracket; a space no larger than it is simply run as a full grid.
+def hyperband(evaluator, space, candidates=CANDIDATES, min_fraction=MIN_FRACTION, eta=ETA, seed=0):
+    rng = random.Random(seed)
+    s_max = max(0, round(math.log(1 / min_fraction, eta)))
+    grid_size = len(grid_candidates(space))
+    if candidates >= grid_size:
+        return grid_search(evaluator, space)
+    finalists = {}
+    for s in range(s_max, -1, -1):
+        n = min(math.ceil(candidates * (s_max + 1) / (s + 1) / eta ** (s_max - s)), grid_size)
+        bracket = sample_candidates(space, n, rng)
+        finalists.update(successive_halving(evaluator, bracket, eta ** -s, eta))
+    return finalists
+
+# Rung scores on short slices only rank configs roughly, so a search often
+# ends next to, not on, the grid optimum. Hill-climb from the best finalist
+# over its grid neighbours (one step along one dimension) on full history
+# until none scores higher; a handful of full passes.
+def grid_neighbours(space, cand):
+    neighbours = []
+    for k, (name, value) in enumerate(cand):
+        values = space[name]
+        i = values.index(value)
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(values):
+                neighbours.append(cand[:k] + ((name, values[j]),) + cand[k + 1:])
+    return neighbours
+
+def refine(evaluator, space, finalists):
+    finalists = dict(finalists)
+    best = max(finalists, key=finalists.get)
+    while True:
+        finalists.update(evaluator.evaluate(grid_neighbours(space, best), 1.0))
+        top = max(finalists, key=finalists.get)
+        if finalists[top] <= finalists[best]:
+            return finalists
+        best = top
+
+def grid_search(evaluator, space):
+    return evaluator.evaluate(grid_candidates(space), 1.0)
+
+def random_search(evaluator, space, n, seed=0):
+    return evaluator.evaluate(sample_candidates(space, n, random.Random(seed)), 1.0)
+
+# `candidates` defaults to the whole grid for halving and to CANDIDATES for
+# hyperband / random search.
+def run_optimizer(strategy, method='halving', csv_path=DEFAULT_CSV, space=None, candidates=None,
+                  min_fraction=MIN_FRACTION, eta=ETA, workers=None, seed=0,
+                  quotes_dir=None, min_trades=MIN_TRADES):
+    space = dict(space or SEARCH_SPACES[strategy])
+    offsets = space.pop('strike_offset', None)
+    with Evaluator(strategy, csv_path, workers, offsets, quotes_dir, min_trades) as evaluator:
+        if method == 'hyperband':
+            final = hyperband(evaluator, space, candidates or CANDIDATES, min_fraction, eta, seed)
+        elif method == 'halving':
+            rng = random.Random(seed)
+            n = candidates or len(grid_candidates(space))
+            final = successive_halving(evaluator, sample_candidates(space, n, rng), min_fraction, eta)
+        elif method == 'random':
+            final = random_search(evaluator, space, candidates or CANDIDATES, seed)
+        elif method == 'grid':
+            final = grid_search(evaluator, space)
+        else:
+            raise ValueError(f"Unknown optimizer method: {method}")
+        if method != 'grid':
+            final = refine(evaluator, space, final)
+
+        # share of the strategy-loop bars that --method grid runs through: one
+        # full-history pass per grid point, offsets swept inside each pass
+        grid_cost = len(grid_candidates(space)) * evaluator.history_bars
+        compute = evaluator.bars_evaluated / grid_cost if grid_cost else float('nan')
+        rows = []
+        for cand, value in final.items():
+            row = dict(cand)
+            if offsets:
+                row['strike_offset'] = evaluator.best_offset[(cand, 1.0)]
+            rows.append(dict(row, score=value))
+
+    ranking = pd.DataFrame(rows).sort_values('score', ascending=False).reset_index(drop=True)
+    return ranking, compute
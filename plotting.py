@@ -0,0 +1,153 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ======================
+# Config
+# ======================
+WIDTH_PX = 1400
+HEIGHT_PX = 700
+DPI = 100
+METHOD = 'minmax'
+
+# ======================
+# Decimation
+# ======================
+# Both return sorted row positions to keep, so every line is drawn from the
+# original values (no resampling / interpolation).
+
+# Min and max of each pixel-wide bucket: spikes survive, draws at most
+# 2 points per pixel column. NaN gaps stay NaN.
+def minmax_indices(y, n_buckets):
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = int(np.ceil(n / n_buckets))
+    pad = (-n) % size
+    lo = np.concatenate([np.where(np.isnan(y), np.inf, y), np.full(pad, np.inf)]).reshape(-1, size)
+    hi = np.concatenate([np.where(np.isnan(y), -np.inf, y), np.full(pad, -np.inf)]).reshape(-1, size)
+    start = np.arange(lo.shape[0]) * size
+    keep = np.concatenate([start + lo.argmin(axis=1), start + hi.argmax(axis=1), [0, n - 1]])
+    return np.unique(keep[keep < n])
+
+# Largest-Triangle-Three-Buckets (Steinarsson 2013). NaN points are dropped,
+# so gaps are bridged rather than broken.
+def lttb_indices(x, y, n_out):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out or n_out < 3:
+        return valid
+    xv, yv = x[valid], y[valid]
+    n = len(valid)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = xv[nxt_lo:nxt_hi].mean()
+        avg_y = yv[nxt_lo:nxt_hi].mean()
+        area = np.abs((xv[a] - avg_x) * (yv[lo:hi] - yv[a]) - (xv[a] - xv[lo:hi]) * (avg_y - yv[a]))
+        a = lo + int(area.argmax())
+        keep[b + 1] = a
+    return valid[keep]
+
+def decimate(x, y, n_points, method=METHOD):
+    if method == 'lttb':
+        return lttb_indices(_as_float(x), y, n_points)
+    if method == 'minmax':
+        return minmax_indices(y, max(n_points // 2, 1))
+    if method in (None, 'none'):
+        return np.arange(len(y))
+    raise ValueError(f"Unknown decimation method: {method}")
+
+def _as_float(x):
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype=float)
+    return x.to_numpy(dtype=float)
+
+# ======================
+# Rendering (Agg, no display)
+# ======================
+# overlays: [(column, color), ...] drawn on top of close; bands: [(lower,
+# upper, color, label), ...] shaded between two columns, decimated on the
+# union of both edges' points; trades: the strategy summary frame, whose
+# markers are always plotted exactly.
+def render_chart(df, path, trades=None, overlays=(), title="", method=METHOD,
+                 width_px=WIDTH_PX, height_px=HEIGHT_PX, dpi=DPI, bands=()):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    n_points = 2 * width_px
+    lines = [('close', 'black', 1, 'Close')] + [(col, color, 1.5, col) for col, color in overlays]
+    for col, color, width, label in lines:
+        idx = decimate(df['time'], df[col], n_points, method)
+        ax.plot(df['time'].iloc[idx], df[col].iloc[idx], color=color, linewidth=width, label=label)
+    for lower, upper, color, label in bands:
+        idx = np.union1d(decimate(df['time'], df[lower], n_points, method),
+                         decimate(df['time'], df[upper], n_points, method))
+        ax.fill_between(df['time'].iloc[idx], df[lower].iloc[idx], df[upper].iloc[idx],
+                        color=color, alpha=0.1, label=label)
+
+    if trades is not None and not trades.empty:
+        signal_time = pd.to_datetime(trades['signal_time'])
+        longs = trades['direction'] == 'long'
+        shorts = trades['direction'] == 'short'
+        ax.scatter(signal_time[longs], trades.loc[longs, 'signal_close'], color='lime', marker='^', s=80, label='Long Signal')
+        ax.scatter(signal_time[shorts], trades.loc[shorts, 'signal_close'], color='red', marker='v', s=80, label='Short Signal')
+
+    ax.set_title(title)
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Price")
+    ax.legend()
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fig.savefig(path)
+    return path
+
+# ======================
+# Batch rendering
+# ======================
+def _render_job(job):
+    return render_chart(**job)
+
+# jobs: list of render_chart kwargs; each chart renders in its own process.
+def render_batch(jobs, workers=None):
+    if not jobs:
+        return []
+    if workers == 1 or len(jobs) == 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs))
+
+def monthly_jobs(df, out_dir, trades=None, overlays=(), title="", fmt='png', **kwargs):
+    months = df['time'].dt.strftime('%Y-%m')
+    if trades is not None and trades.empty:
+        trades = None
+    if trades is not None:
+        trade_months = pd.to_datetime(trades['signal_time']).dt.strftime('%Y-%m')
+    jobs = []
+    for month in months.unique():
+        jobs.append(dict(
+            df=df[months == month].reset_index(drop=True),
+            path=os.path.join(out_dir, f"{month}.{fmt}"),
+            trades=None if trades is None else trades[trade_months.values == month],
+            overlays=overlays,
+            title=f"{title} {month}".strip(),
+            **kwargs,
+        ))
+    return jobs
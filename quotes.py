@@ -0,0 +1,247 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# ======================
+# Config
+# ======================
+QUOTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "kalshi")
+EVENT_TZ = "America/New_York"   # Kalshi event tickers are stamped in ET
+MAX_QUOTE_AGE = pd.Timedelta(minutes=10)
+BAR_LENGTH = pd.Timedelta(minutes=5)   # signals are stamped at bar open, decided at bar close
+FEE_RATE = 0.07                 # taker fee: ceil(rate * C * P * (1 - P)) dollars
+MODEL_VOL_WINDOW = 288          # trailing bars of returns behind model prices (one day)
+
+# KXBTCD-25SEP0117-T108249.99 -> hourly event closing 2025-09-01 17:00 ET,
+# YES pays when BTC settles above 108249.99
+TICKER_RE = re.compile(r"-(\d{2})([A-Z]{3})(\d{2})(\d{2})-T(\d+(?:\.\d+)?)$")
+MONTHS = {m: i for i, m in enumerate(
+    ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], 1)}
+TS_SHIFT = 41                   # ms timestamps fit in 41 bits until 2039
+
+# ======================
+# Loading
+# ======================
+# Quote files are CSVs (one per event, strike, or day -- layout does not
+# matter) with `ticker`, `ts` and `yes_bid` / `yes_ask` in cents. `expiry` and
+# `strike` columns are used when present, otherwise parsed from the ticker.
+def parse_ticker(ticker):
+    m = TICKER_RE.search(ticker)
+    if m is None:
+        return pd.NaT, np.nan
+    yy, mon, dd, hh, strike = m.groups()
+    expiry = pd.Timestamp(2000 + int(yy), MONTHS[mon], int(dd), int(hh), tz=EVENT_TZ)
+    return expiry, float(strike)
+
+def _epoch_ms(values):
+    since = pd.to_datetime(pd.Series(values), utc=True) - pd.Timestamp(0, tz='UTC')
+    return (since // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+
+def _to_utc(values):
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_datetime(values, unit='s', utc=True)
+    return pd.to_datetime(values, utc=True, format='ISO8601')
+
+def read_quote_files(paths):
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        if 'market_ticker' in df and 'ticker' not in df:
+            df = df.rename(columns={'market_ticker': 'ticker'})
+        df['ts'] = _to_utc(df['ts'])
+        if 'expiry' not in df or 'strike' not in df:
+            parsed = {t: parse_ticker(t) for t in df['ticker'].unique()}
+            df['expiry'] = df['ticker'].map(lambda t: parsed[t][0])
+            df['strike'] = df['ticker'].map(lambda t: parsed[t][1])
+        df['expiry'] = _to_utc(df['expiry'])
+        frames.append(df[['ticker', 'expiry', 'strike', 'ts', 'yes_bid', 'yes_ask']])
+    if not frames:
+        raise FileNotFoundError("No quote files found")
+    quotes = pd.concat(frames, ignore_index=True)
+    return quotes.dropna(subset=['expiry', 'strike', 'ts'])
+
+# ======================
+# Columnar index
+# ======================
+# Markets are sorted by (expiry, strike); quotes by (market, ts). Each quote
+# gets the int64 key market << TS_SHIFT | ts_ms so one searchsorted finds the
+# latest quote of a given market at a given time.
+def build_index(quotes):
+    if quotes.empty:
+        raise ValueError("No usable quotes (check ticker / ts columns)")
+    quotes = quotes.sort_values(['expiry', 'strike', 'ts'], kind='mergesort')
+    markets = quotes.drop_duplicates(['expiry', 'strike'])[['ticker', 'expiry', 'strike']]
+    markets = markets.reset_index(drop=True)
+
+    expiry_ms = _epoch_ms(quotes['expiry'])
+    market_expiry = _epoch_ms(markets['expiry'])
+    market_id = np.searchsorted(
+        _market_key(market_expiry, markets['strike'].to_numpy()),
+        _market_key(expiry_ms, quotes['strike'].to_numpy()))
+    ts_ms = _epoch_ms(quotes['ts'])
+
+    return {
+        'market_expiry': market_expiry,
+        'market_strike': markets['strike'].to_numpy(dtype=float),
+        'market_ticker': markets['ticker'].to_numpy(dtype=str),
+        'quote_key': (market_id.astype(np.int64) << TS_SHIFT) | ts_ms,
+        'quote_ts': ts_ms,
+        'yes_bid': quotes['yes_bid'].to_numpy(dtype=float),
+        'yes_ask': quotes['yes_ask'].to_numpy(dtype=float),
+    }
+
+# expiries are whole hours, so (hours since epoch, strike) packs into one
+# sortable float without colliding for any realistic BTC strike
+def _market_key(expiry_ms, strike):
+    return (np.asarray(expiry_ms) // 3_600_000) * 1e7 + np.asarray(strike)
+
+# The cache stores the source file list with sizes and mtimes and is only
+# reused when the current glob matches it exactly (added, removed or rewritten
+# files all force a rebuild).
+MANIFEST_KEYS = ('source_files', 'source_sizes', 'source_mtimes')
+
+def _manifest(quotes_dir, paths):
+    stats = [os.stat(p) for p in paths]
+    return {
+        'source_files': np.array([os.path.relpath(p, quotes_dir) for p in paths], dtype=str),
+        'source_sizes': np.array([st.st_size for st in stats], dtype=np.int64),
+        'source_mtimes': np.array([st.st_mtime_ns for st in stats], dtype=np.int64),
+    }
+
+def load_quotes(quotes_dir=QUOTES_DIR, pattern="**/*.csv"):
+    cache = os.path.join(quotes_dir, "quotes_index.npz")
+    paths = sorted(glob.glob(os.path.join(quotes_dir, pattern), recursive=True))
+    manifest = _manifest(quotes_dir, paths)
+    if os.path.exists(cache):
+        with np.load(cache) as data:
+            if all(k in data.files and np.array_equal(data[k], manifest[k]) for k in MANIFEST_KEYS):
+                return {k: data[k] for k in data.files if k not in MANIFEST_KEYS}
+    index = build_index(read_quote_files(paths))
+    np.savez(cache, **index, **manifest)
+    return index
+
+# ======================
+# As-of join
+# ======================
+# For each signal: the hourly event settling at signal_hour + 1h, its listed
+# strike nearest to the trade's `strike`, and the last quote at or before the
+# signal bar closes (no older than max_age), provided the event has not
+# settled by then. Longs buy YES, shorts buy NO (NO ask = 100 - YES bid).
+def attach_quotes(trades, index, max_age=MAX_QUOTE_AGE, fee_rate=FEE_RATE, bar_length=BAR_LENGTH):
+    trades = trades.copy()
+    n = len(trades)
+    signal_ms = _epoch_ms(pd.to_datetime(trades['signal_time'], utc=True) + bar_length)
+    expiry_ms = _epoch_ms(pd.to_datetime(trades['signal_hour'], utc=True) + pd.Timedelta(hours=1))
+    target = trades['strike'].to_numpy(dtype=float)
+
+    # --- nearest listed strike within the event ---
+    market_keys = _market_key(index['market_expiry'], index['market_strike'])
+    lo = np.searchsorted(index['market_expiry'], expiry_ms, side='left')
+    hi = np.searchsorted(index['market_expiry'], expiry_ms, side='right')
+    pos = np.searchsorted(market_keys, _market_key(expiry_ms, target))
+    below = np.clip(pos - 1, 0, len(market_keys) - 1)
+    above = np.clip(pos, 0, len(market_keys) - 1)
+    has_below = (pos - 1 >= lo) & (pos - 1 < hi)
+    has_above = (pos >= lo) & (pos < hi)
+    strikes = index['market_strike']
+    dist_below = np.where(has_below, np.abs(target - strikes[below]), np.inf)
+    dist_above = np.where(has_above, np.abs(strikes[above] - target), np.inf)
+    market = np.where(dist_below <= dist_above, below, above)
+    listed = (hi > lo)
+
+    # --- latest quote of that market at signal time ---
+    key = (market.astype(np.int64) << TS_SHIFT) | signal_ms
+    q = np.searchsorted(index['quote_key'], key, side='right') - 1
+    q_safe = np.clip(q, 0, len(index['quote_key']) - 1)
+    same_market = (q >= 0) & ((index['quote_key'][q_safe] >> TS_SHIFT) == market)
+    fresh = signal_ms - index['quote_ts'][q_safe] <= max_age / pd.Timedelta(milliseconds=1)
+    # a signal on the hour's last bar is decided as the event settles: no fill
+    found = listed & same_market & fresh & (signal_ms < expiry_ms)
+
+    nan = np.full(n, np.nan)
+    long = (trades['direction'] == 'long').to_numpy()
+    listed_strike = np.where(found, strikes[market], nan)
+    yes_bid = np.where(found, index['yes_bid'][q_safe], nan)
+    yes_ask = np.where(found, index['yes_ask'][q_safe], nan)
+
+    trades['market_ticker'] = np.where(found, index['market_ticker'][market], None)
+    trades['listed_strike'] = listed_strike
+    quote_ms = np.where(found, index['quote_ts'][q_safe], np.nan)
+    trades['quote_time'] = pd.to_datetime(quote_ms, unit='ms', utc=True)
+    trades['yes_bid'] = yes_bid
+    trades['yes_ask'] = yes_ask
+    trades['entry_price'] = np.where(long, yes_ask, 100 - yes_bid)
+    trades['spread'] = yes_ask - yes_bid
+    return _settle_contracts(trades, found, listed_strike, fee_rate)
+
+# Spread-aware P&L per contract, in cents (NaN when unfilled): YES pays 100
+# when the hour closes above `strike`, longs hold YES and shorts hold NO.
+def _settle_contracts(trades, found, strike, fee_rate):
+    long = (trades['direction'] == 'long').to_numpy()
+    final = trades['final_close'].to_numpy(dtype=float)
+    above_strike = final > strike
+    contract_wins = np.where(long, above_strike, ~above_strike)
+    price = trades['entry_price'].to_numpy(dtype=float) / 100
+    fee = np.ceil(fee_rate * price * (1 - price) * 100)
+    trades['fee'] = fee
+    trades['contract_outcome'] = np.where(found, np.where(contract_wins, 'win', 'loss'), None)
+    trades['contract_pnl'] = np.where(found, np.where(contract_wins, 100.0, 0.0) - trades['entry_price'] - fee,
+                                      np.nan)
+    return trades
+
+def pnl_summary(quoted):
+    filled = quoted[quoted['contract_pnl'].notna()]
+    return {
+        'signals': len(quoted),
+        'quoted': len(filled),
+        'contract_wins': int((filled['contract_outcome'] == 'win').sum()),
+        'avg_entry': filled['entry_price'].mean(),
+        'avg_spread': filled['spread'].mean(),
+        'total_pnl': filled['contract_pnl'].sum(),
+        'avg_pnl': filled['contract_pnl'].mean(),
+    }
+
+# ======================
+# Model prices (no quotes)
+# ======================
+# Fair YES price when no quotes are at hand: the share of the last
+# `vol_window` k-bar log returns (k = bars left until the event settles) that
+# would have carried the signal close above the strike. Empirical rather than
+# lognormal: 5-minute returns are fat-tailed and mean-revert, which a normal
+# model with sqrt-time vol misprices by several cents. Fills at that price
+# (whole cents) plus the taker fee, so a strike is only worth taking if the
+# signal beats the odds its distance already implies. Same columns as
+# attach_quotes; signals on the settling bar are not filled.
+def attach_model_prices(trades, bars, vol_window=MODEL_VOL_WINDOW, fee_rate=FEE_RATE,
+                        bar_length=BAR_LENGTH):
+    trades = trades.copy()
+    signal_time = pd.to_datetime(trades['signal_time'])
+    expiry = pd.to_datetime(trades['signal_hour']) + pd.Timedelta(hours=1)
+    bars_left = ((expiry - signal_time - bar_length) / bar_length).to_numpy(dtype=float)
+    close = trades['signal_close'].to_numpy(dtype=float)
+    strike = trades['strike'].to_numpy(dtype=float)
+    needed = np.log(strike / close)
+
+    log_close = np.log(bars['close'].to_numpy(dtype=float))
+    pos = pd.Series(np.arange(len(bars)), index=pd.to_datetime(bars['time'])).reindex(signal_time)
+    pos = pos.to_numpy(dtype=float)
+    p_yes = np.full(len(trades), np.nan)
+    for k in np.unique(bars_left[bars_left > 0]).astype(int):
+        if len(log_close) <= k + vol_window:
+            continue
+        returns = log_close[k:] - log_close[:-k]                  # returns[j] ends at bar j + k
+        windows = np.lib.stride_tricks.sliding_window_view(returns, vol_window)
+        rows = np.flatnonzero((bars_left == k) & (pos - k - vol_window + 1 >= 0))
+        last = pos[rows].astype(int) - k - vol_window + 1         # window ending at the signal bar
+        p_yes[rows] = (windows[last] > needed[rows, None]).mean(axis=1)
+    found = ~np.isnan(p_yes)
+    p_yes = np.clip(np.round(100 * p_yes), 1, 99)
+
+    long = (trades['direction'] == 'long').to_numpy()
+    trades['model_price'] = np.where(found, p_yes, np.nan)
+    trades['entry_price'] = np.where(found, np.where(long, p_yes, 100 - p_yes), np.nan)
+    return _settle_contracts(trades, found, strike, fee_rate)
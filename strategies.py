@@ -0,0 +1,66 @@
+# Strategy registry shared by the CLI (kalshi_bt.py) and the optimizer.
+# Stdlib only: a strategy script (and through it pandas) is imported when
+# load_strategy() asks for it.
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(ROOT, "Data", "BTC5min.csv")
+
+# ======================
+# Strategy registry
+# ======================
+# name -> (script, [(flag, dest, type, stage, help)]); `stage` says whether the
+# option goes to the script's load_data() or run_strategy(). Options left unset
+# fall back to the script's own defaults.
+STRATEGIES = {
+    'rsi': ('rsi.py', [
+        ('--long-below', 'long_below', float, 'run', "go long when RSI is below this"),
+        ('--short-above', 'short_above', float, 'run', "go short when RSI is above this"),
+        ('--strike-offset', 'strike_offset', float, 'run', "strike distance from the signal close"),
+    ]),
+    'stoch': ('Stoch.py', [
+        ('--long-below', 'long_below', float, 'run', "K ceiling for a bullish K/D cross"),
+        ('--short-above', 'short_above', float, 'run', "K floor for a bearish K/D cross"),
+        ('--strike-offset', 'strike_offset', float, 'run', "strike distance from the signal close"),
+    ]),
+    'supertrend': ('Test.py', [
+        ('--period', 'period', int, 'load', "SuperTrend ATR period"),
+        ('--multiplier', 'multiplier', float, 'load', "SuperTrend ATR multiplier"),
+        ('--strike-offset', 'strike_offset', float, 'run', "strike distance from the signal close"),
+    ]),
+    'squeeze': (os.path.join('Test', 'test2.py'), [
+        ('--ema-short', 'ema_short', int, 'load', "fast trend EMA span"),
+        ('--ema-long', 'ema_long', int, 'load', "slow trend EMA span (also the warm-up)"),
+        ('--boll-window', 'boll_window', int, 'load', "Bollinger band window"),
+        ('--squeeze-ratio', 'squeeze_ratio', float, 'load', "band width vs its 50-bar mean counted as a squeeze"),
+        ('--strike-offset', 'strike_offset', float, 'run', "strike distance from the signal close"),
+    ]),
+}
+HOUR_LOCK_STRATEGIES = {'supertrend', 'squeeze'}
+
+
+def load_strategy(name):
+    # strategy scripts import their helpers (indicators.py) from the repo root
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    path = os.path.join(ROOT, STRATEGIES[name][0])
+    spec = importlib.util.spec_from_file_location(f"_kalshi_bt_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def split_params(name, args):
+    load_kwargs, run_kwargs = {}, {}
+    for _, dest, _, stage, _ in STRATEGIES[name][1]:
+        if dest in args:
+            (load_kwargs if stage == 'load' else run_kwargs)[dest] = getattr(args, dest)
+    if 'hour_lock' in args:
+        run_kwargs['hour_lock'] = args.hour_lock
+    # the squeeze loop warms up over the slow EMA and the band window
+    if name == 'squeeze':
+        for key in ('ema_long', 'boll_window'):
+            if key in load_kwargs:
+                run_kwargs['warmup' if key == 'ema_long' else key] = load_kwargs[key]
+    return load_kwargs, run_kwargs
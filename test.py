@@ -1,5 +1,7 @@
 import pandas as pd
 
+from indicators import compute_oscillators
+
 # --- File path ---
 csv_path = r"/Users/kevinzhu/PycharmProjects/KalshiProject/Data/BTC5min.csv"
 
@@ -9,20 +11,20 @@ df['time'] = pd.to_datetime(df['time'])
 df = df.sort_values('time').reset_index(drop=True)
 df['hour'] = df['time'].dt.floor('h')
 
+# --- Indicators (recomputed from OHLC, replaces exported columns) ---
+df = compute_oscillators(df)
+start = df[['K', 'D']].notna().all(axis=1).idxmax()
+
 results = []
 prev_state = None
 in_trade = False
 current_trade_end = None
 
-for i in range(len(df)):
+for i in range(start, len(df)):
     row = df.iloc[i]
     time = row['time']
     k, d = row['K'], row['D']
 
-    # --- skip missing values ---
-    if pd.isna(k) or pd.isna(d):
-        continue
-
     # --- exit trade lock once hour changes ---
     if in_trade and time >= current_trade_end:
         in_trade = False
@@ -32,7 +34,7 @@ for i in range(len(df)):
     if in_trade:
         continue
 
-    # --- determine state ---
+    # --- determine state (K/D are NaN between 10-minute closes; state carries over) ---
     if k > d:
         curr_state = 'k_over_d'
     elif k < d: